@@ -1,42 +1,121 @@
 #!/usr/bin/env python3
 """Script to fetch HTML page from ozon.ru"""
 
-import requests
+import asyncio
+import sys
+from typing import Optional
 
+import httpx
 
-def fetch_ozon_page(url: str = "https://www.ozon.ru") -> str:
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": "br, gzip",
+}
+
+# Shared client - keeps the HTTP/2 connection alive between calls
+CLIENT = httpx.Client(
+    http2=True,
+    headers=HEADERS,
+    timeout=30,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=10),
+)
+
+
+def fetch_ozon_page(url: str = "https://www.ozon.ru", out_path: Optional[str] = None) -> str | int:
     """
     Fetch HTML content from ozon.ru
 
     Args:
         url: URL to fetch, defaults to ozon.ru homepage
+        out_path: If set, stream the body into this file instead of returning it
 
     Returns:
-        HTML content as string
+        HTML content as string, or number of bytes written if out_path is set
+    """
+    if out_path is None:
+        response = CLIENT.get(url)
+        response.raise_for_status()
+        return response.text
+
+    with CLIENT.stream("GET", url) as response:
+        response.raise_for_status()
+        # iter_bytes() undoes br/gzip so the file holds plain HTML
+        with open(out_path, "wb") as f:
+            for chunk in response.iter_bytes(65536):
+                f.write(chunk)
+            return f.tell()
+
+
+async def fetch_many(urls: list[str], concurrency: int = 32) -> list[str | Exception]:
     """
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
-    }
+    Fetch several pages concurrently over one HTTP/2 client
 
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
+    Args:
+        urls: URLs to fetch
+        concurrency: Maximum number of requests in flight
 
-    return response.text
+    Returns:
+        HTML contents in the same order as urls; a failed URL gets its exception
+        instead, without affecting the others
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        http2=True,
+        headers=HEADERS,
+        timeout=30,
+        follow_redirects=True,
+        limits=limits,
+    ) as client:
+
+        async def fetch(url: str) -> str:
+            async with semaphore:
+                response = await client.get(url)
+                response.raise_for_status()
+                return response.text
+
+        # Every request finishes before the client closes
+        return await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+
+
+def close() -> None:
+    """Close pooled connections"""
+    CLIENT.close()
 
 
 def main():
-    """Main function to fetch and save ozon.ru page"""
-    print("Fetching ozon.ru...")
+    """Main function to fetch and save ozon.ru pages"""
+    urls = sys.argv[1:]
+
+    if len(urls) <= 1:
+        print("Fetching ozon.ru...")
+
+        output_file = "ozon_page.html"
+        try:
+            size = fetch_ozon_page(*urls, out_path=output_file)
+        finally:
+            close()
+
+        print(f"Saved to {output_file} ({size} bytes)")
+        return
+
+    print(f"Fetching {len(urls)} pages...")
+    pages = asyncio.run(fetch_many(urls))
 
-    html = fetch_ozon_page()
+    for i, (url, html) in enumerate(zip(urls, pages)):
+        if isinstance(html, Exception):
+            print(f"Failed to fetch {url}: {html}", file=sys.stderr)
+            continue
 
-    output_file = "ozon_page.html"
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(html)
+        output_file = f"ozon_page_{i}.html"
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(html)
 
-    print(f"Saved to {output_file} ({len(html)} bytes)")
+        print(f"Saved to {output_file} ({len(html)} bytes)")
 
 
 if __name__ == "__main__":
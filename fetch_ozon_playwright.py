@@ -21,12 +21,14 @@ def fetch_page(url: str = "https://www.ozon.ru", output_file: str = "page.html")
             locale="ru-RU",
         )
         page = context.new_page()
+        page.set_default_navigation_timeout(30000)
 
         print(f"Fetching {url}...")
-        page.goto(url, wait_until="networkidle", timeout=60000)
+        # networkidle never settles on pages with analytics beacons
+        page.goto(url, wait_until="domcontentloaded")
 
-        # Wait for content to load
-        page.wait_for_timeout(3000)
+        # Wait for content to render
+        page.wait_for_selector("body", state="visible")
 
         html = page.content()
 
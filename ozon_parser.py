@@ -4,33 +4,207 @@ Ozon Parser - uses real browser via Playwright to fetch product data
 """
 
 import json
+import os
+import queue
 import sys
-import time
+import threading
 import re
-from playwright.sync_api import sync_playwright, Page, Browser
+from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext, Route, TimeoutError as PlaywrightTimeoutError
+
+_PRODUCT_ID_RE = re.compile(r'/product/[^/]+-(\d+)')
+
+# Search results widget on Ozon search pages. Product links are looked up
+# only inside it, skipping header, footer and recommendation widgets.
+SEARCH_GRID_SELECTOR = 'div[data-widget="searchResultsV2"]'
+
+# Walks product links in the search grid, skipping repeated product ids, and stops
+# once enough products are collected. The id pattern is _PRODUCT_ID_RE.
+SEARCH_RESULTS_JS = """
+({max, pattern, grid}) => {
+    const idRe = new RegExp(pattern);
+    const root = document.querySelector(grid) || document;
+    const seen = new Set();
+    const out = [];
+    for (const a of root.querySelectorAll('a[href*="/product/"]')) {
+        if (out.length >= max) break;
+        const href = a.getAttribute('href');
+        const match = href && href.match(idRe);
+        if (!match || seen.has(match[1])) continue;
+        seen.add(match[1]);
+        const img = a.querySelector('img');
+        out.push({
+            id: match[1],
+            href,
+            text: a.innerText || '',
+            image: (img && img.getAttribute('src')) || '',
+        });
+    }
+    return out;
+}
+"""
 
+# True once the search grid holds enough unique products, or once scrolling
+# stops loading more: the count stayed the same at the bottom of the page or
+# for SEARCH_STALL_POLLS polls in a row. Otherwise scrolls down so the next
+# poll sees the lazily loaded batch. Poll state lives on window and is reset
+# by navigation.
+SEARCH_STALL_POLLS = 4
+
+SEARCH_LOADED_JS = """
+({max, pattern, grid, stallPolls}) => {
+    const idRe = new RegExp(pattern);
+    const root = document.querySelector(grid) || document;
+    const seen = new Set();
+    for (const a of root.querySelectorAll('a[href*="/product/"]')) {
+        if (seen.size >= max) break;
+        const match = (a.getAttribute('href') || '').match(idRe);
+        if (match) seen.add(match[1]);
+    }
+    if (seen.size >= max) return true;
+
+    const state = window.__searchLoad ??= {count: -1, stalls: 0};
+    state.stalls = seen.size === state.count ? state.stalls + 1 : 0;
+    state.count = seen.size;
+    const atBottom = window.scrollY + window.innerHeight >= document.documentElement.scrollHeight;
+    if (state.stalls >= stallPolls || (atBottom && state.stalls > 0 && seen.size > 0)) return true;
+
+    window.scrollBy(0, window.innerHeight);
+    return false;
+}
+"""
 
-class OzonParser:
-    def __init__(self, headless: bool = True, debug: bool = False):
+# Reads all product page fields in one evaluate() call
+PRODUCT_DETAILS_JS = """
+() => {
+    const text = (sel) => document.querySelector(sel)?.innerText.trim() ?? null;
+    return {
+        name: text('h1'),
+        price: text('[data-widget="webPrice"]'),
+        images: Array.from(
+            document.querySelectorAll('[data-widget="webGallery"] img'),
+            (img) => img.getAttribute('src'),
+        ).filter(Boolean),
+        rating: text('[data-widget="webReviewProductScore"]'),
+    };
+}
+"""
+
+# Resources the parser never reads; aborting them makes pages load faster.
+# Stylesheets are kept: search() splits each card's innerText into lines,
+# and innerText follows the rendered layout.
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+
+# True once the page is past the antibot check
+ANTIBOT_PASSED_JS = (
+    "() => !document.title.includes('Antibot')"
+    " && !(document.body?.textContent ?? '').includes('Доступ ограничен')"
+)
+
+
+def _block_heavy_resources(route: Route):
+    """Abort requests for resources listed in BLOCKED_RESOURCE_TYPES"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+class BrowserPool:
+    """
+    One browser plus a pool of ready contexts shared by OzonParser instances
+
+    Contexts come with stealth scripts and resource blocking installed and
+    go back to the pool on release, so a worker pays the browser start and
+    context setup once instead of per parser.
+
+    Sync Playwright objects are bound to the thread that started them, so a
+    pool belongs to the thread that starts it; use one pool per thread.
+    Calls from any other thread raise RuntimeError.
+    """
+
+    def __init__(self, headless: bool = True, size: int = 4, debug: bool = False):
         self.headless = headless
         self.debug = debug
         self.playwright = None
         self.browser = None
-        self.context = None
-
-    def __enter__(self):
-        self.start()
-        return self
+        self._owner: threading.Thread | None = None
+        self._contexts: queue.Queue[BrowserContext] = queue.Queue(maxsize=size)
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.stop()
+    def _check_thread(self):
+        """Raise if called outside the thread that started the pool"""
+        if self._owner is not None and self._owner is not threading.current_thread():
+            raise RuntimeError(
+                f"BrowserPool is owned by thread {self._owner.name}, "
+                f"used from {threading.current_thread().name}; use one pool per thread"
+            )
 
     def start(self):
         """Start browser"""
+        self._check_thread()
+        self._owner = threading.current_thread()
         self.playwright = sync_playwright().start()
 
-        # Launch real Chromium browser
-        self.browser = self.playwright.chromium.launch(
+        # Attach to an externally managed Chromium if OZON_CDP_URL is set,
+        # otherwise launch a private one
+        endpoint = os.environ.get('OZON_CDP_URL')
+        if endpoint:
+            self.browser = self.playwright.chromium.connect_over_cdp(endpoint)
+            if self.debug:
+                print(f"Connected to shared browser: {endpoint}", file=sys.stderr)
+        else:
+            self.browser = self._launch_browser()
+
+        if self.debug:
+            print("Browser started", file=sys.stderr)
+
+    def close(self):
+        """Close pooled contexts and stop browser"""
+        self._check_thread()
+        while True:
+            try:
+                self._contexts.get_nowait().close()
+            except queue.Empty:
+                break
+        if self.browser:
+            # Disconnects from a shared browser, closes our own one
+            self.browser.close()
+        if self.playwright:
+            self.playwright.stop()
+        if self.debug:
+            print("Browser stopped", file=sys.stderr)
+
+    def acquire(self) -> BrowserContext:
+        """Take a ready context from the pool, creating one if it is empty"""
+        self._check_thread()
+        if self.browser is None:
+            self.start()
+
+        try:
+            return self._contexts.get_nowait()
+        except queue.Empty:
+            context = self.new_context()
+            context.route('**/*', _block_heavy_resources)
+            return context
+
+    def release(self, context: BrowserContext, clear_cookies: bool = False):
+        """
+        Return context to the pool
+
+        Cookies are kept by default so the antibot token survives; pass
+        clear_cookies=True when the next user must not share them.
+        """
+        self._check_thread()
+        if clear_cookies:
+            context.clear_cookies()
+
+        try:
+            self._contexts.put_nowait(context)
+        except queue.Full:
+            context.close()
+
+    def _launch_browser(self) -> Browser:
+        """Launch real Chromium browser"""
+        return self.playwright.chromium.launch(
             headless=self.headless,
             args=[
                 '--no-sandbox',
@@ -40,8 +214,11 @@ class OzonParser:
             ]
         )
 
+    def new_context(self) -> BrowserContext:
+        """Create new browser context with stealth scripts, without the pool"""
+        self._check_thread()
         # Create context with realistic settings
-        self.context = self.browser.new_context(
+        context = self.browser.new_context(
             viewport={'width': 1920, 'height': 1080},
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             locale='ru-RU',
@@ -49,7 +226,7 @@ class OzonParser:
         )
 
         # Add stealth scripts
-        self.context.add_init_script("""
+        context.add_init_script("""
             // Remove webdriver flag
             Object.defineProperty(navigator, 'webdriver', {
                 get: () => undefined
@@ -79,230 +256,209 @@ class OzonParser:
             };
         """)
 
-        if self.debug:
-            print("Browser started", file=sys.stderr)
+        return context
+
+
+class OzonParser:
+    def __init__(self, headless: bool = True, debug: bool = False, pool: BrowserPool | None = None):
+        self.headless = headless
+        self.debug = debug
+        # Without a pool given, the parser owns a private one for its lifetime
+        self.pool = pool
+        self._owns_pool = pool is None
+        self.context = None
+        self._page = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """Take a browser context from the pool"""
+        if self.pool is None:
+            self.pool = BrowserPool(headless=self.headless, size=1, debug=self.debug)
+
+        self.context = self.pool.acquire()
+
+        # One tab reused by every call instead of a new page per call; it
+        # stays open in the context when the context goes back to the pool.
+        # Calls run one at a time on the pool's thread, so the tab needs no lock
+        self._page = self.context.pages[0] if self.context.pages else self.context.new_page()
 
     def stop(self):
-        """Stop browser"""
+        """Return context to the pool"""
         if self.context:
-            self.context.close()
-        if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
-        if self.debug:
-            print("Browser stopped", file=sys.stderr)
+            self.pool.release(self.context)
+            self.context = None
+        if self._owns_pool and self.pool:
+            self.pool.close()
+            self.pool = None
 
     def _wait_for_page(self, page: Page, timeout: int = 30):
         """Wait for page to fully load and pass antibot"""
-        start = time.time()
-
-        while time.time() - start < timeout:
-            title = page.title()
-            html = page.content()
-
-            # Check if we passed antibot
-            if 'Доступ ограничен' not in html and 'Antibot' not in title:
-                if self.debug:
-                    print(f"Page loaded: {title}", file=sys.stderr)
-                return True
+        if self.debug:
+            print("Waiting for antibot...", file=sys.stderr)
 
-            if self.debug:
-                print(f"Waiting for antibot... ({int(time.time() - start)}s)", file=sys.stderr)
+        # Check if we passed antibot, polled inside the page without CDP chatter.
+        # The first check runs at once, so a page already past antibot costs one round trip.
+        try:
+            page.wait_for_function(
+                ANTIBOT_PASSED_JS,
+                timeout=timeout * 1000,
+                polling=200,
+            )
+        except PlaywrightTimeoutError:
+            return False
 
-            time.sleep(1)
+        if self.debug:
+            print(f"Page loaded: {page.title()}", file=sys.stderr)
 
-        return False
+        return True
 
     def get_page_html(self, url: str) -> str:
         """Get raw HTML of page"""
-        page = self.context.new_page()
-
-        try:
-            if self.debug:
-                print(f"Opening: {url}", file=sys.stderr)
-
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
+        page = self._page
 
-            # Wait for page to load
-            time.sleep(3)
+        if self.debug:
+            print(f"Opening: {url}", file=sys.stderr)
 
-            # Simulate human behavior
-            page.mouse.move(500, 300)
-            time.sleep(0.5)
-            page.mouse.wheel(0, 300)
-            time.sleep(1)
+        page.goto(url, wait_until='domcontentloaded', timeout=60000)
 
-            # Wait for antibot to pass
-            if not self._wait_for_page(page, timeout=30):
-                if self.debug:
-                    print("Failed to pass antibot", file=sys.stderr)
+        # Simulate human behavior
+        page.mouse.move(500, 300)
+        page.mouse.wheel(0, 300)
 
-            return page.content()
+        # Wait for antibot to pass
+        if not self._wait_for_page(page, timeout=30):
+            if self.debug:
+                print("Failed to pass antibot", file=sys.stderr)
 
-        finally:
-            page.close()
+        return page.content()
 
     def search(self, query: str, max_products: int = 10) -> dict:
         """Search for products"""
         url = f"https://www.ozon.ru/search/?text={query}&from_global=true"
-        page = self.context.new_page()
 
+        page = self._page
+
+        if self.debug:
+            print(f"Searching: {query}", file=sys.stderr)
+
+        page.goto(url, wait_until='domcontentloaded', timeout=60000)
+
+        # Wait for antibot
+        if not self._wait_for_page(page, timeout=30):
+            html = page.content()
+            with open('/tmp/ozon_debug.html', 'w') as f:
+                f.write(html)
+            return {'query': query, 'count': 0, 'products': [], 'error': 'antibot_blocked'}
+
+        search_args = {
+            'max': max_products,
+            'pattern': _PRODUCT_ID_RE.pattern,
+            'grid': SEARCH_GRID_SELECTOR,
+            'stallPolls': SEARCH_STALL_POLLS,
+        }
+
+        # Scroll until max_products cards are rendered or no more load;
+        # keep what loaded on timeout
         try:
+            page.wait_for_function(SEARCH_LOADED_JS, arg=search_args, polling=500, timeout=20000)
+        except PlaywrightTimeoutError:
             if self.debug:
-                print(f"Searching: {query}", file=sys.stderr)
+                print("Search results still loading, using what is rendered", file=sys.stderr)
 
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            time.sleep(3)
-
-            # Simulate scrolling
-            for _ in range(3):
-                page.mouse.wheel(0, 500)
-                time.sleep(1)
-
-            # Wait for antibot
-            if not self._wait_for_page(page, timeout=30):
-                html = page.content()
-                with open('/tmp/ozon_debug.html', 'w') as f:
-                    f.write(html)
-                return {'query': query, 'count': 0, 'products': [], 'error': 'antibot_blocked'}
-
-            # Additional scroll to load products
-            for _ in range(3):
-                page.mouse.wheel(0, 800)
-                time.sleep(0.5)
-
-            time.sleep(2)
-
-            # Extract products
-            products = []
-
-            # Find all product links
-            links = page.query_selector_all('a[href*="/product/"]')
-
-            seen = set()
-            for link in links:
-                if len(products) >= max_products:
-                    break
-
-                try:
-                    href = link.get_attribute('href')
-                    if not href or '/product/' not in href:
-                        continue
-
-                    # Extract product ID to avoid duplicates
-                    match = re.search(r'/product/[^/]+-(\d+)', href)
-                    if not match:
-                        continue
-
-                    product_id = match.group(1)
-                    if product_id in seen:
-                        continue
-                    seen.add(product_id)
-
-                    # Get product info
-                    full_url = f"https://www.ozon.ru{href}" if href.startswith('/') else href
-
-                    # Try to get text content
-                    text = link.inner_text() or ''
-                    lines = [l.strip() for l in text.split('\n') if l.strip()]
-
-                    name = ''
-                    price = ''
-
-                    for line in lines:
-                        if '₽' in line and not price:
-                            price = line
-                        elif len(line) > 10 and not name and '₽' not in line:
-                            name = line
-
-                    # Get image
-                    image = ''
-                    img = link.query_selector('img')
-                    if img:
-                        image = img.get_attribute('src') or ''
-
-                    products.append({
-                        'name': name,
-                        'price': price,
-                        'link': full_url,
-                        'image': image,
-                        'id': product_id
-                    })
-
-                except Exception as e:
-                    if self.debug:
-                        print(f"Error parsing product: {e}", file=sys.stderr)
-                    continue
-
-            return {
-                'query': query,
-                'count': len(products),
-                'products': products
-            }
+        # Extract products
+        products = []
 
-        finally:
-            page.close()
+        # Unique product links, capped at max_products, in one round trip
+        links = page.evaluate(SEARCH_RESULTS_JS, search_args)
+
+        for link in links:
+            href = link['href']
+
+            # Get product info
+            full_url = f"https://www.ozon.ru{href}" if href.startswith('/') else href
+
+            lines = [l.strip() for l in link['text'].split('\n') if l.strip()]
+
+            name = ''
+            price = ''
+
+            for line in lines:
+                if '₽' in line and not price:
+                    price = line
+                elif len(line) > 10 and not name and '₽' not in line:
+                    name = line
+
+            products.append({
+                'name': name,
+                'price': price,
+                'link': full_url,
+                'image': link['image'],
+                'id': link['id']
+            })
+
+        return {
+            'query': query,
+            'count': len(products),
+            'products': products
+        }
 
     def get_product(self, url: str) -> dict:
         """Get product details"""
-        page = self.context.new_page()
+        page = self._page
 
-        try:
-            if self.debug:
-                print(f"Opening product: {url}", file=sys.stderr)
+        if self.debug:
+            print(f"Opening product: {url}", file=sys.stderr)
 
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            time.sleep(3)
+        page.goto(url, wait_until='domcontentloaded', timeout=60000)
 
-            # Simulate human
-            page.mouse.wheel(0, 300)
-            time.sleep(1)
+        # Simulate human
+        page.mouse.wheel(0, 300)
 
-            if not self._wait_for_page(page, timeout=30):
-                return {'error': 'antibot_blocked', 'url': url}
+        if not self._wait_for_page(page, timeout=30):
+            return {'error': 'antibot_blocked', 'url': url}
 
-            product = {'url': url}
+        try:
+            page.wait_for_selector('h1', timeout=15000)
+        except PlaywrightTimeoutError:
+            if self.debug:
+                print("Product title not found", file=sys.stderr)
 
-            # Get title
-            h1 = page.query_selector('h1')
-            if h1:
-                product['name'] = h1.inner_text().strip()
+        product = {'url': url}
+        details = page.evaluate(PRODUCT_DETAILS_JS)
 
-            # Get price
-            price_el = page.query_selector('[data-widget="webPrice"]')
-            if price_el:
-                product['price'] = price_el.inner_text().strip()
+        if details['name'] is not None:
+            product['name'] = details['name']
 
-            # Get images
-            images = []
-            for img in page.query_selector_all('[data-widget="webGallery"] img'):
-                src = img.get_attribute('src')
-                if src:
-                    images.append(src)
-            product['images'] = images
+        if details['price'] is not None:
+            product['price'] = details['price']
 
-            # Get rating
-            rating_el = page.query_selector('[data-widget="webReviewProductScore"]')
-            if rating_el:
-                product['rating'] = rating_el.inner_text().strip()
+        product['images'] = details['images']
 
-            return product
+        if details['rating'] is not None:
+            product['rating'] = details['rating']
 
-        finally:
-            page.close()
+        return product
 
     def screenshot(self, url: str, path: str = '/tmp/screenshot.png') -> str:
         """Take screenshot of page"""
-        page = self.context.new_page()
+        # Separate context without resource blocking, screenshots need visuals
+        context = self.pool.new_context()
 
         try:
+            page = context.new_page()
             page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            time.sleep(5)
+            # Screenshot needs images, so wait for the full load event
+            page.wait_for_load_state('load')
             page.screenshot(path=path, full_page=True)
             return path
         finally:
-            page.close()
+            context.close()
 
 
 def main():
@@ -2,117 +2,470 @@
 """Wildberries MCP Server - allows AI to search and browse products on Wildberries"""
 
 import asyncio
-import json
+import fcntl
+import os
 import re
+import sys
+import tempfile
 from typing import Optional
 
 from fastmcp import FastMCP
-from playwright.async_api import async_playwright, Page, Browser
+import orjson
+from playwright.async_api import async_playwright, Page, BrowserContext, Route, TimeoutError as PlaywrightTimeoutError
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
 mcp = FastMCP(name="Wildberries")
 
-# Global browser instance
-_browser: Optional[Browser] = None
+# Browser profile kept on disk so cookies and antibot tokens survive restarts
+USER_DATA_DIR = os.environ.get("WB_USER_DATA", os.path.expanduser("~/.cache/wb-mcp/profile"))
+
+_NON_DIGIT_RE = re.compile(r"[^\d]")
+
+# Resources the tools never read; aborting them makes pages load faster
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+
+# True once the page is past the antibot check
+ANTIBOT_PASSED_JS = "() => !document.title.includes('Почти готово') && !document.title.includes('Доступ ограничен')"
+
+# Global browser instance. All tools navigate the same tab (_page) rather than
+# opening a new page per call, which would redo renderer and init script setup
+_context: Optional[BrowserContext] = None
 _page: Optional[Page] = None
 _playwright = None
 
+# Held for the process lifetime: lock on USER_DATA_DIR, or the temporary
+# profile used when another session already owns it
+_profile_lock = None
+_temp_profile: Optional[tempfile.TemporaryDirectory] = None
+
+# Serializes browser start: tool calls arriving together at cold start must
+# share one launch instead of each starting a Chromium
+_browser_lock = asyncio.Lock()
+
+
+async def block_heavy_resources(route: Route) -> None:
+    """Abort requests for resources listed in BLOCKED_RESOURCE_TYPES"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def claim_profile_dir() -> str:
+    """Lock the persistent profile for this process, or fall back to a temporary one"""
+    global _profile_lock, _temp_profile
+
+    # Already claimed by an earlier (possibly failed) launch in this process
+    if _profile_lock is not None:
+        return USER_DATA_DIR
+    if _temp_profile is not None:
+        return _temp_profile.name
+
+    os.makedirs(USER_DATA_DIR, exist_ok=True)
+    lock = open(f"{USER_DATA_DIR}.lock", "w")
+
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        # Two Chromiums on one profile corrupt it or refuse to start
+        lock.close()
+        _temp_profile = tempfile.TemporaryDirectory(prefix="wb-mcp-profile-", ignore_cleanup_errors=True)
+        print(f"{USER_DATA_DIR} is used by another session, using a temporary profile", file=sys.stderr)
+        return _temp_profile.name
+
+    _profile_lock = lock
+    return USER_DATA_DIR
 
-async def get_browser() -> tuple[Browser, Page]:
+
+async def get_browser() -> tuple[BrowserContext, Page]:
     """Get or create browser instance"""
-    global _browser, _page, _playwright
+    async with _browser_lock:
+        if _context is None:
+            await launch_browser()
+
+    return _context, _page
+
+
+async def launch_browser() -> None:
+    """Start Chromium on the claimed profile and set up the shared tab"""
+    global _context, _page, _playwright
 
-    if _browser is None:
-        _playwright = await async_playwright().start()
-        _browser = await _playwright.chromium.launch(
+    user_data_dir = claim_profile_dir()
+    playwright = await async_playwright().start()
+
+    try:
+        context = await playwright.chromium.launch_persistent_context(
+            user_data_dir=user_data_dir,
             headless=True,
+            viewport={"width": 1920, "height": 1080},
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            locale="ru-RU",
+            timezone_id="Europe/Moscow",
             args=[
                 "--disable-blink-features=AutomationControlled",
                 "--no-sandbox",
                 "--disable-setuid-sandbox",
                 "--disable-dev-shm-usage",
-            ]
-        )
-        context = await _browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            locale="ru-RU",
-            timezone_id="Europe/Moscow",
+            ],
+            ignore_default_args=["--enable-automation"],
         )
         await context.add_init_script("""
             Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
         """)
-        _page = await context.new_page()
+        await context.route("**/*", block_heavy_resources)
+        # Persistent context always opens with one blank tab
+        page = context.pages[0] if context.pages else await context.new_page()
+    except BaseException:
+        # Leave nothing half started; the next call retries on the same profile
+        await playwright.stop()
+        raise
 
-    return _browser, _page
+    _playwright, _context, _page = playwright, context, page
 
 
 async def wait_for_antibot(page: Page, timeout: int = 30) -> bool:
     """Wait for antibot check to pass"""
-    for _ in range(timeout):
-        await asyncio.sleep(1)
-        title = await page.title()
-        if "Почти готово" not in title and "Доступ ограничен" not in title:
-            return True
-    return False
+    # Poll the title inside the page instead of a CDP round trip per check.
+    # The first check runs at once, so a page already past antibot costs one round trip.
+    try:
+        await page.wait_for_function(
+            ANTIBOT_PASSED_JS,
+            timeout=timeout * 1000,
+            polling=200,
+        )
+    except PlaywrightTimeoutError:
+        return False
+
+    return True
+
+
+# Product grid on Wildberries search and category pages. Cards are looked up
+# only inside it, skipping header, footer and recommendation widgets.
+PRODUCT_GRID_SELECTOR = "div.product-card-list, div.catalog_main_table"
+
+# Fields read from every product card: (key, selector, type)
+CARD_FIELDS = [
+    ("name", "span.product-card__name", str),
+    ("brand", "span.product-card__brand", str),
+    ("price", "ins.price__lower-price", int),
+    ("rating", "span.address-rate-mini", float),
+]
+
+# Fields read from the product page: (key, selector, type)
+PRODUCT_FIELDS = [
+    ("name", "h1.product-page__title", str),
+    ("brand", "a.product-page__header-brand", str),
+    ("price", "ins.price-block__final-price", int),
+    ("old_price", "del.price-block__old-price", int),
+    ("rating", "span.product-review__rating", float),
+    ("reviews_count", "span.product-review__count-review", int),
+    ("seller", "a.seller-info__name", str),
+]
+
+# Polls between scrolls without new items before a list counts as fully loaded
+LOAD_STALL_POLLS = 4
+
+# True once enough items matching selector are rendered inside root (or the
+# whole document), or once scrolling stops loading more: the count stayed the
+# same at the bottom of the page or for stallPolls polls in a row. Otherwise
+# scrolls down so the next poll sees the lazily loaded batch. Poll state lives
+# on window and is reset by navigation.
+ITEMS_LOADED_JS = """
+({root, selector, count, stallPolls}) => {
+    const scope = (root && document.querySelector(root)) || document;
+    const found = scope.querySelectorAll(selector).length;
+    if (found >= count) return true;
+
+    const state = window.__itemsLoad ??= {count: -1, stalls: 0};
+    state.stalls = found === state.count ? state.stalls + 1 : 0;
+    state.count = found;
+    const atBottom = window.scrollY + window.innerHeight >= document.documentElement.scrollHeight;
+    if (state.stalls >= stallPolls || (atBottom && state.stalls > 0 && found > 0)) return true;
+
+    window.scrollBy(0, window.innerHeight);
+    return false;
+}
+"""
+
+# Page-side extractors for pages that are not parsed offline: walk the DOM in
+# one evaluate() call instead of a CDP round trip per element and attribute
+FIELDS_JS = """
+(selectors) => Object.fromEntries(Object.entries(selectors).map(
+    ([key, sel]) => [key, document.querySelector(sel)?.textContent.trim() ?? null]
+))
+"""
+
+REVIEWS_JS = """
+(limit) => Array.from(document.querySelectorAll('.feedback'))
+    .slice(0, limit)
+    .map((review) => {
+        const text = (sel) => review.querySelector(sel)?.textContent.trim() ?? null;
+        return {
+            text: text('.feedback__text'),
+            rating: review.querySelectorAll('.feedback__rating svg.active').length,
+            author: text('.feedback__header-author'),
+            date: text('.feedback__date'),
+        };
+    })
+"""
+
+SELLERS_JS = """
+() => {
+    const text = (root, sel) => root.querySelector(sel)?.textContent.trim() ?? null;
+    return {
+        main: {
+            name: text(document, 'a.seller-info__name'),
+            price: text(document, 'ins.price-block__final-price'),
+        },
+        others: Array.from(document.querySelectorAll('.sellers-list__item'), (item) => ({
+            name: text(item, '.seller-name'),
+            price: text(item, '.price'),
+        })),
+    };
+}
+"""
+
+
+def dump_json(obj) -> str:
+    """Serialize tool result as indented JSON, non-ASCII kept as is"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
+def node_text(node: LexborNode, selector: str) -> Optional[str]:
+    """Trimmed text of the first element matching selector, if any"""
+    el = node.css_first(selector)
+    return el.text().strip() if el else None
+
+
+def parse_field(text: Optional[str], kind: type) -> Optional[str | int | float]:
+    """Convert extracted text to field type, None if missing or malformed"""
+    if text is None or kind is str:
+        return text
+
+    if kind is int:
+        digits = _NON_DIGIT_RE.sub("", text)
+        return int(digits) if digits else None
+
+    try:
+        return kind(text)
+    except ValueError:
+        return None
+
+
+def fill_fields(target: dict, fields: list[tuple], found: dict) -> None:
+    """Store parsed values of found texts in target, skipping missing ones"""
+    for key, _, kind in fields:
+        value = parse_field(found[key], kind)
+        if value is not None:
+            target[key] = value
 
 
-async def extract_products(page: Page) -> list[dict]:
+async def wait_for_items(page: Page, selector: str, count: int, root: Optional[str] = None, timeout: int = 10000) -> None:
+    """Scroll until count items are rendered or no more load; keep what loaded on timeout"""
+    try:
+        await page.wait_for_function(
+            ITEMS_LOADED_JS,
+            arg={"root": root, "selector": selector, "count": count, "stallPolls": LOAD_STALL_POLLS},
+            polling=500,
+            timeout=timeout,
+        )
+    except PlaywrightTimeoutError:
+        pass
+
+
+async def extract_products(page: Page, limit: int = 50) -> list[dict]:
     """Extract product cards from page"""
     products = []
 
     try:
         await page.wait_for_selector("article.product-card", timeout=10000)
-        await asyncio.sleep(2)
     except Exception:
         return products
 
-    cards = await page.query_selector_all("article.product-card")
-
-    for card in cards[:50]:  # Limit to 50 products
-        try:
-            product = {}
-
-            # Product ID
-            nm_id = await card.get_attribute("data-nm-id")
-            if nm_id:
-                product["id"] = nm_id
-                product["url"] = f"https://www.wildberries.ru/catalog/{nm_id}/detail.aspx"
-
-            # Name
-            name_el = await card.query_selector("span.product-card__name")
-            if name_el:
-                product["name"] = (await name_el.inner_text()).strip()
-
-            # Brand
-            brand_el = await card.query_selector("span.product-card__brand")
-            if brand_el:
-                product["brand"] = (await brand_el.inner_text()).strip()
-
-            # Price
-            price_el = await card.query_selector("ins.price__lower-price")
-            if price_el:
-                price_text = (await price_el.inner_text()).strip()
-                price_clean = re.sub(r"[^\d]", "", price_text)
-                if price_clean:
-                    product["price"] = int(price_clean)
-
-            # Rating
-            rating_el = await card.query_selector("span.address-rate-mini")
-            if rating_el:
-                try:
-                    product["rating"] = float((await rating_el.inner_text()).strip())
-                except ValueError:
-                    pass
-
-            if product.get("id"):
-                products.append(product)
-
-        except Exception:
+    # Cards are added lazily while scrolling
+    await wait_for_items(page, "article.product-card[data-nm-id]", limit, root=PRODUCT_GRID_SELECTOR)
+
+    # Parse a snapshot of the DOM locally; the browser is only needed for
+    # navigation and antibot
+    tree = LexborHTMLParser(await page.content())
+    grid = tree.css_first(PRODUCT_GRID_SELECTOR) or tree
+
+    for card in grid.css("article.product-card"):
+        if len(products) >= limit:
+            break
+
+        nm_id = card.attributes.get("data-nm-id")
+        if not nm_id:
             continue
 
+        product = {"id": nm_id, "url": product_url(nm_id)}
+
+        found = {key: node_text(card, selector) for key, selector, _ in CARD_FIELDS}
+        fill_fields(product, CARD_FIELDS, found)
+
+        products.append(product)
+
     return products
 
 
+def product_url(product_id: str) -> str:
+    """Product detail page URL"""
+    return f"https://www.wildberries.ru/catalog/{product_id}/detail.aspx"
+
+
+async def open_product_page(page: Page, product_id: str) -> bool:
+    """Open product page in given tab, False if antibot check failed"""
+    await page.goto(product_url(product_id), wait_until="domcontentloaded", timeout=60000)
+
+    if not await wait_for_antibot(page):
+        return False
+
+    try:
+        await page.wait_for_selector(".product-page", timeout=10000)
+    except Exception:
+        pass
+
+    return True
+
+
+async def read_product(page: Page, product_id: str) -> dict:
+    """Read product details from an opened product page"""
+    product = {"id": product_id, "url": product_url(product_id)}
+    found = await page.evaluate(FIELDS_JS, {key: selector for key, selector, _ in PRODUCT_FIELDS})
+    fill_fields(product, PRODUCT_FIELDS, found)
+
+    return product
+
+
+async def read_sellers(page: Page, product_id: str) -> dict:
+    """Read all sellers from an opened product page, opening the sellers modal"""
+    # Try to find "all sellers" button and click it
+    try:
+        sellers_btn = await page.query_selector("button.seller-info__more")
+        if sellers_btn:
+            await sellers_btn.click()
+            await page.wait_for_selector(".sellers-list__item", timeout=5000)
+    except Exception:
+        pass
+
+    sellers = []
+    seen_names: set[str] = set()
+    found = await page.evaluate(SELLERS_JS)
+
+    # Main seller first, then other sellers from modal if opened
+    for item in [found["main"], *found["others"]]:
+        name = item["name"]
+        if not name or name in seen_names:
+            continue
+        seen_names.add(name)
+
+        seller = {"name": name}
+
+        price = parse_field(item["price"], int)
+        if price is not None:
+            seller["price"] = price
+
+        sellers.append(seller)
+
+    return {
+        "product_id": product_id,
+        "count": len(sellers),
+        "sellers": sellers
+    }
+
+
+async def scrape_product(page: Page, product_id: str) -> dict:
+    """Open product page in given tab and read its details"""
+    if not await open_product_page(page, product_id):
+        return {"error": "Failed to pass antibot check"}
+
+    return await read_product(page, product_id)
+
+
+async def scrape_reviews(page: Page, product_id: str, limit: int) -> dict:
+    """Open product reviews page in given tab and read up to limit reviews"""
+    url = f"https://www.wildberries.ru/catalog/{product_id}/feedbacks"
+
+    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+
+    if not await wait_for_antibot(page):
+        return {"error": "Failed to pass antibot check"}
+
+    try:
+        await page.wait_for_selector(".feedback", timeout=10000)
+    except Exception:
+        return {
+            "product_id": product_id,
+            "count": 0,
+            "reviews": []
+        }
+
+    # Reviews load in batches; take what is there if the product has fewer
+    await wait_for_items(page, ".feedback", limit)
+
+    reviews = []
+
+    for item in await page.evaluate(REVIEWS_JS, limit):
+        if not item["text"]:
+            continue
+
+        review = {"text": item["text"], "rating": item["rating"] or None}
+
+        if item["author"] is not None:
+            review["author"] = item["author"]
+
+        if item["date"] is not None:
+            review["date"] = item["date"]
+
+        reviews.append(review)
+
+    return {
+        "product_id": product_id,
+        "count": len(reviews),
+        "reviews": reviews
+    }
+
+
+async def scrape_sellers(page: Page, product_id: str) -> dict:
+    """Open product page in given tab and read all its sellers"""
+    if not await open_product_page(page, product_id):
+        return {"error": "Failed to pass antibot check"}
+
+    return await read_sellers(page, product_id)
+
+
+async def scrape_product_and_sellers(page: Page, product_id: str) -> tuple[dict, dict]:
+    """Open product page once and read both details and sellers from it"""
+    if not await open_product_page(page, product_id):
+        error = {"error": "Failed to pass antibot check"}
+        return error, error
+
+    # Fields first: the sellers modal covers the page once opened
+    product = await read_product(page, product_id)
+    sellers = await read_sellers(page, product_id)
+
+    return product, sellers
+
+
+async def fetch_product_bundle(product_id: str, reviews_limit: int = 10) -> dict:
+    """Load product and reviews pages in parallel tabs of the shared context"""
+    context, _ = await get_browser()
+    pages: list[Page] = []
+
+    try:
+        for _ in range(2):
+            pages.append(await context.new_page())
+
+        (product, sellers), reviews = await asyncio.gather(
+            scrape_product_and_sellers(pages[0], product_id),
+            scrape_reviews(pages[1], product_id, reviews_limit),
+        )
+    finally:
+        await asyncio.gather(*(page.close() for page in pages))
+
+    return {"product": product, "reviews": reviews, "sellers": sellers}
+
+
 @mcp.tool
 async def wb_search(
     query: str,
@@ -139,16 +492,16 @@ async def wb_search(
     await page.goto(url, wait_until="domcontentloaded", timeout=60000)
 
     if not await wait_for_antibot(page):
-        return json.dumps({"error": "Failed to pass antibot check"}, ensure_ascii=False)
+        return dump_json({"error": "Failed to pass antibot check"})
 
-    products = (await extract_products(page))[:limit]
+    products = await extract_products(page, limit)
 
-    return json.dumps({
+    return dump_json({
         "query": query,
         "sort": sort,
         "count": len(products),
         "products": products
-    }, ensure_ascii=False, indent=2)
+    })
 
 
 @mcp.tool
@@ -163,88 +516,9 @@ async def wb_product(product_id: str) -> str:
         JSON with product details: name, brand, price, rating, reviews_count, description, seller, url
     """
     _, page = await get_browser()
+    product = await scrape_product(page, product_id)
 
-    url = f"https://www.wildberries.ru/catalog/{product_id}/detail.aspx"
-
-    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-
-    if not await wait_for_antibot(page):
-        return json.dumps({"error": "Failed to pass antibot check"}, ensure_ascii=False)
-
-    try:
-        await page.wait_for_selector(".product-page", timeout=10000)
-        await asyncio.sleep(2)
-    except Exception:
-        pass
-
-    product = {"id": product_id, "url": url}
-
-    # Name
-    try:
-        name_el = await page.query_selector("h1.product-page__title")
-        if name_el:
-            product["name"] = (await name_el.inner_text()).strip()
-    except Exception:
-        pass
-
-    # Brand
-    try:
-        brand_el = await page.query_selector("a.product-page__header-brand")
-        if brand_el:
-            product["brand"] = (await brand_el.inner_text()).strip()
-    except Exception:
-        pass
-
-    # Price
-    try:
-        price_el = await page.query_selector("ins.price-block__final-price")
-        if price_el:
-            price_text = (await price_el.inner_text()).strip()
-            price_clean = re.sub(r"[^\d]", "", price_text)
-            if price_clean:
-                product["price"] = int(price_clean)
-    except Exception:
-        pass
-
-    # Old price
-    try:
-        old_price_el = await page.query_selector("del.price-block__old-price")
-        if old_price_el:
-            old_price_text = (await old_price_el.inner_text()).strip()
-            old_price_clean = re.sub(r"[^\d]", "", old_price_text)
-            if old_price_clean:
-                product["old_price"] = int(old_price_clean)
-    except Exception:
-        pass
-
-    # Rating
-    try:
-        rating_el = await page.query_selector("span.product-review__rating")
-        if rating_el:
-            product["rating"] = float((await rating_el.inner_text()).strip())
-    except Exception:
-        pass
-
-    # Reviews count
-    try:
-        reviews_el = await page.query_selector("span.product-review__count-review")
-        if reviews_el:
-            reviews_text = (await reviews_el.inner_text()).strip()
-            reviews_clean = re.sub(r"[^\d]", "", reviews_text)
-            if reviews_clean:
-                product["reviews_count"] = int(reviews_clean)
-    except Exception:
-        pass
-
-    # Seller
-    try:
-        seller_el = await page.query_selector("a.seller-info__name")
-        if seller_el:
-            product["seller"] = (await seller_el.inner_text()).strip()
-    except Exception:
-        pass
-
-    return json.dumps(product, ensure_ascii=False, indent=2)
+    return dump_json(product)
 
 
 @mcp.tool
@@ -279,16 +553,16 @@ async def wb_category(
     await page.goto(url, wait_until="domcontentloaded", timeout=60000)
 
     if not await wait_for_antibot(page):
-        return json.dumps({"error": "Failed to pass antibot check"}, ensure_ascii=False)
+        return dump_json({"error": "Failed to pass antibot check"})
 
-    products = (await extract_products(page))[:limit]
+    products = await extract_products(page, limit)
 
-    return json.dumps({
+    return dump_json({
         "category_url": category_url,
         "sort": sort,
         "count": len(products),
         "products": products
-    }, ensure_ascii=False, indent=2)
+    })
 
 
 @mcp.tool
@@ -307,63 +581,9 @@ async def wb_reviews(
         JSON with list of reviews containing text, rating, author, date
     """
     _, page = await get_browser()
+    reviews = await scrape_reviews(page, product_id, min(limit, 30))
 
-    limit = min(limit, 30)
-
-    url = f"https://www.wildberries.ru/catalog/{product_id}/feedbacks"
-
-    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-
-    if not await wait_for_antibot(page):
-        return json.dumps({"error": "Failed to pass antibot check"}, ensure_ascii=False)
-
-    try:
-        await page.wait_for_selector(".feedback", timeout=10000)
-        await asyncio.sleep(2)
-    except Exception:
-        return json.dumps({
-            "product_id": product_id,
-            "count": 0,
-            "reviews": []
-        }, ensure_ascii=False, indent=2)
-
-    reviews = []
-    review_els = await page.query_selector_all(".feedback")
-
-    for review_el in review_els[:limit]:
-        try:
-            review = {}
-
-            # Text
-            text_el = await review_el.query_selector(".feedback__text")
-            if text_el:
-                review["text"] = (await text_el.inner_text()).strip()
-
-            # Rating
-            stars = await review_el.query_selector_all(".feedback__rating svg.active")
-            review["rating"] = len(stars) if stars else None
-
-            # Author
-            author_el = await review_el.query_selector(".feedback__header-author")
-            if author_el:
-                review["author"] = (await author_el.inner_text()).strip()
-
-            # Date
-            date_el = await review_el.query_selector(".feedback__date")
-            if date_el:
-                review["date"] = (await date_el.inner_text()).strip()
-
-            if review.get("text"):
-                reviews.append(review)
-
-        except Exception:
-            continue
-
-    return json.dumps({
-        "product_id": product_id,
-        "count": len(reviews),
-        "reviews": reviews
-    }, ensure_ascii=False, indent=2)
+    return dump_json(reviews)
 
 
 @mcp.tool
@@ -378,81 +598,36 @@ async def wb_sellers(product_id: str) -> str:
         JSON with list of sellers containing name, price, rating
     """
     _, page = await get_browser()
+    sellers = await scrape_sellers(page, product_id)
 
-    url = f"https://www.wildberries.ru/catalog/{product_id}/detail.aspx"
-
-    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+    return dump_json(sellers)
 
-    if not await wait_for_antibot(page):
-        return json.dumps({"error": "Failed to pass antibot check"}, ensure_ascii=False)
-
-    try:
-        await page.wait_for_selector(".product-page", timeout=10000)
-        await asyncio.sleep(2)
-    except Exception:
-        pass
 
-    # Try to find "all sellers" button and click it
-    try:
-        sellers_btn = await page.query_selector("button.seller-info__more")
-        if sellers_btn:
-            await sellers_btn.click()
-            await asyncio.sleep(2)
-    except Exception:
-        pass
+@mcp.tool
+async def wb_product_full(
+    product_id: str,
+    reviews_limit: int = 10
+) -> str:
+    """
+    Get product details, reviews and sellers in one call
 
-    sellers = []
+    Faster than calling wb_product, wb_reviews and wb_sellers one by one:
+    product page and reviews page are loaded in parallel, sellers are read
+    from the same product page.
 
-    # Get main seller
-    try:
-        main_seller = {}
-        seller_el = await page.query_selector("a.seller-info__name")
-        if seller_el:
-            main_seller["name"] = (await seller_el.inner_text()).strip()
-
-        price_el = await page.query_selector("ins.price-block__final-price")
-        if price_el:
-            price_text = (await price_el.inner_text()).strip()
-            price_clean = re.sub(r"[^\d]", "", price_text)
-            if price_clean:
-                main_seller["price"] = int(price_clean)
-
-        if main_seller.get("name"):
-            sellers.append(main_seller)
-    except Exception:
-        pass
+    Args:
+        product_id: Wildberries product ID
+        reviews_limit: Maximum number of reviews (default 10, max 30)
 
-    # Get other sellers from modal if opened
-    try:
-        seller_items = await page.query_selector_all(".sellers-list__item")
-        for item in seller_items:
-            seller = {}
-
-            name_el = await item.query_selector(".seller-name")
-            if name_el:
-                seller["name"] = (await name_el.inner_text()).strip()
-
-            price_el = await item.query_selector(".price")
-            if price_el:
-                price_text = (await price_el.inner_text()).strip()
-                price_clean = re.sub(r"[^\d]", "", price_text)
-                if price_clean:
-                    seller["price"] = int(price_clean)
-
-            if seller.get("name") and seller not in sellers:
-                sellers.append(seller)
-    except Exception:
-        pass
+    Returns:
+        JSON with "product", "reviews" and "sellers" sections, same as the separate tools return
+    """
+    bundle = await fetch_product_bundle(product_id, min(reviews_limit, 30))
 
-    return json.dumps({
-        "product_id": product_id,
-        "count": len(sellers),
-        "sellers": sellers
-    }, ensure_ascii=False, indent=2)
+    return dump_json(bundle)
 
 
 if __name__ == "__main__":
-    import sys
     transport = sys.argv[1] if len(sys.argv) > 1 else "stdio"
     if transport == "sse":
         mcp.run(transport="sse", host="0.0.0.0", port=8000)